@@ -0,0 +1,174 @@
+"""
+Senticore • Analysis pipeline
+
+Model inference plus the rule-based helpers (emotion, aspects, sarcasm,
+keywords) used by ``app.py``. Kept free of Streamlit so the same code can be
+replayed offline (see ``replay.py``).
+"""
+
+import re
+import time
+
+
+# ---------------------------
+# Model inference
+# ---------------------------
+def predict_sentiment(text: str, model, vectorizer):
+    X = vectorizer.transform([text])
+    return predict_batch(X, model)[0]
+
+
+def predict_batch(X, model):
+    """Predictions and percentage probabilities for an already vectorized batch."""
+    probs = model.predict_proba(X)
+    preds = model.classes_[probs.argmax(axis=1)]
+    results = []
+    for pred, row in zip(preds, probs):
+        # ✅ Map probabilities to class labels (lowercased for consistency)
+        prob_dict = {
+            cls.lower(): round(float(p * 100), 2)
+            for cls, p in zip(model.classes_, row)
+        }
+        results.append((str(pred), prob_dict))
+    return results
+
+
+# ---------------------------
+# Rule-based helpers
+# ---------------------------
+def emoji_to_emotion(text):
+    mapping = {"🙂":"joy", "😊":"joy", "😃":"joy", "😢":"sadness", "😭":"sadness", "😡":"anger", "😠":"anger", "😱":"fear", "😲":"surprise", "🤢":"disgust", "😐":"neutral"}
+    for e, emo in mapping.items():
+        if e in text:
+            return emo
+    if re.search(r'(:-\)|:\)|:D)', text): return "joy"
+    if re.search(r'(:-\(|:\()', text): return "sadness"
+    if "/s" in text.lower(): return "sarcasm"
+    return None
+
+def detect_emotion(text):
+    emo = emoji_to_emotion(text)
+    if emo: return "surprise" if emo == "sarcasm" else emo
+    emotion_keywords = {"joy":["love","happy", "great","amazing"],"anger":["hate","angry","furious"],"sadness":["sad","terrible","worst"],"surprise":["wow","shocked"],"fear":["scared","worried"],"disgust":["disgusting","gross","nasty"]}
+    txt = text.lower()
+    for emo, kws in emotion_keywords.items():
+        if any(k in txt for k in kws): return emo
+    return "neutral"
+
+def aspect_based_analysis(text, general_sentiment):
+    """Per-aspect sentiment; falls back to the model's overall sentiment as "General"."""
+    text_lower = text.lower()
+    aspect_keywords = {"Camera":["camera","photo"],"Battery":["battery","charge"],"Screen":["screen","display"],"Performance":["speed","lag","performance"],"Design":["design","look"],"Price":["price","cost"],"Audio":["audio","sound","speaker"]}
+    positive = {"good","great","excellent","love","nice","fast","bright"}
+    negative = {"bad","terrible","worst","slow","dim","crash","broken"}
+    aspects = {}
+    for aspect, kws in aspect_keywords.items():
+        if any(k in text_lower for k in kws):
+            pos = sum(1 for p in positive if p in text_lower)
+            neg = sum(1 for n in negative if n in text_lower)
+            if pos > neg: aspects[aspect] = "positive"
+            elif neg > pos: aspects[aspect] = "negative"
+            else: aspects[aspect] = "neutral"
+    if not aspects:
+        aspects["General"] = general_sentiment
+    return aspects
+
+
+def sarcasm_detector(text):
+    txt = text.lower()
+
+    # Rule 1: explicit sarcasm cues
+    if any(phrase in txt for phrase in ["/s", "yeah right", "as if", "sure thing", "just perfect", "oh wow"]):
+        return True
+
+    # Rule 2: "I love/like how/that ..." + negative context
+    if re.search(r'\bi (love|like) (how|that)\b', txt) and re.search(r'\b(crash|fail|bad|worst|broken|useless)\b', txt):
+        return True
+
+    # Rule 3: positive + negative word mix
+    if re.search(r'\b(good|great|love|amazing)\b', txt) and re.search(r'\b(bad|worst|hate|awful|terrible|disaster)\b', txt):
+        return True
+
+    return False
+
+
+def explain_keywords(text, vectorizer, top_k=3, X=None, names=None):
+    """Top tf-idf terms of ``text``.
+
+    Pass ``X`` (its vectorized row) and ``names`` (the vectorizer's feature
+    names) to avoid recomputing them for every text in a batch.
+    """
+    if X is None:
+        X = vectorizer.transform([text])
+    arr = X.toarray()[0]
+    if arr.sum() == 0:
+        return re.findall(r'\w+', text)[:top_k]
+    idxs = arr.argsort()[::-1]
+    if names is None:
+        names = vectorizer.get_feature_names_out()
+    kws = [names[i] for i in idxs if arr[i] > 0]
+    clean_kws = [kw.replace("word__", "").replace("char__", "") for kw in kws]
+    return clean_kws[:top_k]
+
+def chatbot_response(sentiment):
+    s = sentiment.lower().strip()   # normalize
+    if s == "negative":
+        return "💡 I'm sorry to hear that. Stay strong!"
+    elif s == "positive":
+        return "🎉 That's awesome! Keep going!"
+    else:
+        return "🙂 Got it! Thanks for sharing."
+
+
+# names of the rule functions that can be swapped out for a revised version
+RULE_FUNCTIONS = ("emoji_to_emotion", "detect_emotion", "aspect_based_analysis", "sarcasm_detector")
+
+DEFAULT_RULES = {name: globals()[name] for name in RULE_FUNCTIONS}
+
+
+# ---------------------------
+# Full pipeline
+# ---------------------------
+def analyze_batch(texts, model, vectorizer, rules=None, top_k=3):
+    """Run the whole pipeline over a batch of texts.
+
+    ``rules`` maps names from ``RULE_FUNCTIONS`` to replacement functions.
+    Returns ``(results, timings)`` where ``timings`` holds the total seconds
+    spent in each stage.
+    """
+    rules = {**DEFAULT_RULES, **(rules or {})}
+    timings = {}
+
+    t0 = time.perf_counter()
+    X = vectorizer.transform(texts)
+    timings["vectorize"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    predictions = predict_batch(X, model)
+    timings["predict"] = time.perf_counter() - t0
+
+    results = [{"text": text, "prediction": pred, "probs": probs}
+               for text, (pred, probs) in zip(texts, predictions)]
+
+    t0 = time.perf_counter()
+    for r in results:
+        r["emotion"] = rules["emoji_to_emotion"](r["text"]) or rules["detect_emotion"](r["text"])
+    timings["emotion"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for r in results:
+        r["aspects"] = rules["aspect_based_analysis"](r["text"], r["prediction"])
+    timings["aspects"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for r in results:
+        r["sarcasm"] = bool(rules["sarcasm_detector"](r["text"]))
+    timings["sarcasm"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    names = vectorizer.get_feature_names_out()
+    for i, r in enumerate(results):
+        r["keywords"] = explain_keywords(r["text"], vectorizer, top_k, X=X[i], names=names)
+    timings["keywords"] = time.perf_counter() - t0
+
+    return results, timings
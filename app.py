@@ -1,28 +1,70 @@
 
 import streamlit as st
 import joblib
+import os
+import json
 import pandas as pd
-import re
 from datetime import datetime
 import plotly.graph_objects as go
 from sklearn.feature_extraction.text import TfidfVectorizer
 import matplotlib.pyplot as plt
 from io import BytesIO
 from reportlab.pdfgen import canvas
+from storage import get_backend
+from analysis import analyze_batch, chatbot_response
+from replay import capture_request
+from monitoring import DriftMonitor, MIN_ALERT_SAMPLES
 
 
 
+st.set_page_config(page_title="Senticore • Sentiment Dashboard", page_icon="🧠", layout="wide")
+
+
 # ---------------------------
 # Load model & vectorizer
 # ---------------------------
-model = joblib.load("senticore_model.pkl")
-vectorizer = joblib.load("senticore_vectorizer.pkl")
+# loaded once per server process, not on every rerun
+@st.cache_resource
+def load_artifacts():
+    # SENTICORE_MODEL can point at a compressed forest from compress_model.py
+    model = joblib.load(os.environ.get("SENTICORE_MODEL", "senticore_model.pkl"))
+    vectorizer = joblib.load("senticore_vectorizer.pkl")
+    return model, vectorizer
+
+model, vectorizer = load_artifacts()
+
 
 # ---------------------------
-# Page config & theme
+# Shared backend (users, sessions, history)
 # ---------------------------
-st.set_page_config(page_title="Senticore • Sentiment Dashboard", page_icon="🧠", layout="wide")
+@st.cache_resource
+def load_backend():
+    return get_backend()
+
+backend = load_backend()
+
+# set SENTICORE_CAPTURE to a .jsonl path to log analyzed requests for replay.py
+CAPTURE_PATH = os.environ.get("SENTICORE_CAPTURE")
+
+
+# ---------------------------
+# Drift monitor (one per server process, fixed memory)
+# ---------------------------
+@st.cache_resource
+def load_monitor():
+    return DriftMonitor(vectorizer)
 
+monitor = load_monitor()
+
+# comma-separated usernames allowed to open the Model Health page
+ADMINS = {u.strip() for u in os.environ.get("SENTICORE_ADMINS", "").split(",") if u.strip()}
+
+def is_admin():
+    return st.session_state.logged_in and st.session_state.username in ADMINS
+
+# ---------------------------
+# Theme
+# ---------------------------
 if "theme" not in st.session_state:
     st.session_state.theme = "dark"
 
@@ -76,14 +118,12 @@ st.markdown("""
 # ---------------------------
 # Session-state defaults
 # ---------------------------
-if "users" not in st.session_state:
-    st.session_state.users = {}
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
 if "username" not in st.session_state:
     st.session_state.username = None
-if "history" not in st.session_state:
-    st.session_state.history = []
+if "session_token" not in st.session_state:
+    st.session_state.session_token = None
 if "page" not in st.session_state:
     st.session_state.page = "Home"
 
@@ -91,6 +131,41 @@ if "page" not in st.session_state:
 if "logout_confirm" not in st.session_state:
     st.session_state.logout_confirm = False
 
+def clear_login():
+    if st.session_state.session_token:
+        backend.delete_session(st.session_state.session_token)
+    st.query_params.pop("session", None)
+    st.session_state.session_token = None
+    st.session_state.pop("last_result", None)
+    st.session_state.pop("history_exports", None)
+    st.session_state.logged_in = False
+    st.session_state.username = None
+
+
+# restore login from the session token in the URL, so any replica can serve this user;
+# the token is rotated on restore so a copied link stops working once it has been used
+if not st.session_state.logged_in:
+    restored_user, new_token = backend.rotate_session(st.query_params.get("session"))
+    if restored_user:
+        st.session_state.logged_in = True
+        st.session_state.username = restored_user
+        st.session_state.session_token = new_token
+        st.query_params["session"] = new_token
+    else:
+        # stale or already-rotated token: drop it so later reruns don't retry the write
+        st.query_params.pop("session", None)
+# keep an active session alive; log out if it expired or was revoked
+elif not backend.touch_session(st.session_state.session_token):
+    clear_login()
+    st.session_state.page = "Home"
+
+def keep_session_alive():
+    """Same check for fragments, whose reruns skip the top-level code above."""
+    if not backend.touch_session(st.session_state.session_token):
+        clear_login()
+        st.session_state.page = "Home"
+        st.rerun(scope="app")
+
 
 def generate_result_pdf(text, result):
     buffer = BytesIO()
@@ -125,103 +200,6 @@ def generate_history_pdf(history):
     return buffer
 
 # ---------------------------
-# Helper functions
-# ---------------------------
-
-
-def predict_sentiment(text: str):
-    X = vectorizer.transform([text])
-    pred = model.predict(X)[0]
-
-    # ✅ Get real probabilities from RandomForest (or any classifier with predict_proba)
-    probs = model.predict_proba(X)[0]
-
-    # ✅ Map probabilities to class labels (lowercased for consistency)
-    prob_dict = {
-        cls.lower(): round(float(p * 100), 2)
-        for cls, p in zip(model.classes_, probs)
-    }
-
-    return pred, prob_dict
-
-
-
-def emoji_to_emotion(text):
-    mapping = {"🙂":"joy", "😊":"joy", "😃":"joy", "😢":"sadness", "😭":"sadness", "😡":"anger", "😠":"anger", "😱":"fear", "😲":"surprise", "🤢":"disgust", "😐":"neutral"}
-    for e, emo in mapping.items():
-        if e in text:
-            return emo
-    if re.search(r'(:-\)|:\)|:D)', text): return "joy"
-    if re.search(r'(:-\(|:\()', text): return "sadness"
-    if "/s" in text.lower(): return "sarcasm"
-    return None
-
-def detect_emotion(text):
-    emo = emoji_to_emotion(text)
-    if emo: return "surprise" if emo == "sarcasm" else emo
-    emotion_keywords = {"joy":["love","happy", "great","amazing"],"anger":["hate","angry","furious"],"sadness":["sad","terrible","worst"],"surprise":["wow","shocked"],"fear":["scared","worried"],"disgust":["disgusting","gross","nasty"]}
-    txt = text.lower()
-    for emo, kws in emotion_keywords.items():
-        if any(k in txt for k in kws): return emo
-    return "neutral"
-
-def aspect_based_analysis(text):
-    text_lower = text.lower()
-    aspect_keywords = {"Camera":["camera","photo"],"Battery":["battery","charge"],"Screen":["screen","display"],"Performance":["speed","lag","performance"],"Design":["design","look"],"Price":["price","cost"],"Audio":["audio","sound","speaker"]}
-    positive = {"good","great","excellent","love","nice","fast","bright"}
-    negative = {"bad","terrible","worst","slow","dim","crash","broken"}
-    aspects = {}
-    for aspect, kws in aspect_keywords.items():
-        if any(k in text_lower for k in kws):
-            pos = sum(1 for p in positive if p in text_lower)
-            neg = sum(1 for n in negative if n in text_lower)
-            if pos > neg: aspects[aspect] = "positive"
-            elif neg > pos: aspects[aspect] = "negative"
-            else: aspects[aspect] = "neutral"
-    if not aspects:
-        general, _ = predict_sentiment(text)
-        aspects["General"] = general
-    return aspects
-
-
-def sarcasm_detector(text):
-    txt = text.lower()
-
-    # Rule 1: explicit sarcasm cues
-    if any(phrase in txt for phrase in ["/s", "yeah right", "as if", "sure thing", "just perfect", "oh wow"]):
-        return True
-
-    # Rule 2: "I love/like how/that ..." + negative context
-    if re.search(r'\bi (love|like) (how|that)\b', txt) and re.search(r'\b(crash|fail|bad|worst|broken|useless)\b', txt):
-        return True
-
-    # Rule 3: positive + negative word mix
-    if re.search(r'\b(good|great|love|amazing)\b', txt) and re.search(r'\b(bad|worst|hate|awful|terrible|disaster)\b', txt):
-        return True
-
-    return False
-
-
-def explain_keywords(text, top_k=3):
-    X = vectorizer.transform([text])
-    arr = X.toarray()[0]
-    if arr.sum() == 0:
-        return re.findall(r'\w+', text)[:top_k]
-    idxs = arr.argsort()[::-1]
-    names = vectorizer.get_feature_names_out()
-    kws = [names[i] for i in idxs if arr[i] > 0]
-    clean_kws = [kw.replace("word__", "").replace("char__", "") for kw in kws]
-    return clean_kws[:top_k]
-
-def chatbot_response(sentiment):
-    s = sentiment.lower().strip()   # normalize
-    if s == "negative":
-        return "💡 I'm sorry to hear that. Stay strong!"
-    elif s == "positive":
-        return "🎉 That's awesome! Keep going!"
-    else:
-        return "🙂 Got it! Thanks for sharing."
-# ---------------------------
 # Pages
 # ---------------------------
 def home_page():
@@ -297,9 +275,12 @@ def sign_in_page():
     if submit:
         if not user or not pw:
             st.error("Please enter both username and password.")
-        elif user in st.session_state.users and st.session_state.users[user] == pw:
+        elif backend.verify_user(user, pw):
+            token = backend.create_session(user)
             st.session_state.logged_in = True
             st.session_state.username = user
+            st.session_state.session_token = token
+            st.query_params["session"] = token
             st.success(f"✅ Logged in as {user}")
             # navigate to Try it Out (or Home) after sign-in
             st.session_state.page = "Home"
@@ -354,10 +335,9 @@ def sign_up_page():
     if create:
         if not new_user or not new_pw:
             st.error("Please enter a username and password.")
-        elif new_user in st.session_state.users:
+        elif not backend.create_user(new_user, new_pw):
             st.error("Username already exists. Choose a different one.")
         else:
-            st.session_state.users[new_user] = new_pw
             st.success("✅ Account created — please sign in.")
             st.session_state.page = "Sign In"
             st.rerun()
@@ -436,6 +416,14 @@ Welcome to **Senticore**! Here's how to get the most out of your sentiment analy
 
 def try_it_out_page():
     st.title("⚡ Try it Out")
+    analyzer_fragment()
+
+
+# reruns on its own when the text area or buttons inside it change
+@st.fragment
+def analyzer_fragment():
+    keep_session_alive()
+
     # styled label we control
     st.markdown(
     '<div style="color:#B8860B; font-weight:600; font-size:16px; margin-bottom:6px;">💬 Enter your text here</div>',
@@ -456,122 +444,147 @@ def try_it_out_page():
             st.warning("⚠ Please enter some text.")
             return
 
-        # ✅ Get prediction and fixed confidence scores
-        sentiment, probs = predict_sentiment(text)
-        emo = emoji_to_emotion(text) or detect_emotion(text)
-        aspects = aspect_based_analysis(text)
-        is_sarcastic = sarcasm_detector(text)
-        keywords = explain_keywords(text)
+        # ✅ Get prediction, confidence scores and rule-based outputs in one pass
+        result = analyze_batch([text], model, vectorizer)[0][0]
+        if CAPTURE_PATH:
+            capture_request(CAPTURE_PATH, result)
+        monitor.observe(text, result["prediction"], result["probs"], result["emotion"])
+
+        # 🎯 Save to history
+        backend.add_history(st.session_state.username, {
+            "text": text,
+            "prediction": result["prediction"],
+            "emotion": result["emotion"],
+            "aspects": result["aspects"],
+            "sarcasm": result["sarcasm"],
+            "keywords": ", ".join(result["keywords"]),
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        })
+
+        # ✅ Keep the last result (and its PDF) so later reruns just re-render it
+        result["pdf"] = generate_result_pdf(text, result["prediction"]).getvalue()
+        st.session_state.last_result = result
+
+    if st.session_state.get("last_result"):
+        render_analysis_result(st.session_state.last_result)
 
-        # 🎯 Show sentiment result
-        st.markdown(f"### 🏷️ Prediction: **{sentiment.title()}**")
 
-        # 🎯 Show confidence scores (fixed distributions)
-        st.markdown("### 📊 Confidence Scores:")
-        st.write(f"**Positive:** {probs.get('positive',0)}%")
-        st.write(f"**Neutral:** {probs.get('neutral',0)}%")
-        st.write(f"**Negative:** {probs.get('negative',0)}%")
+def render_analysis_result(result):
+    sentiment, probs = result["prediction"], result["probs"]
+    emo = result["emotion"]
+    aspects = result["aspects"]
+    is_sarcastic = result["sarcasm"]
+    keywords = result["keywords"]
 
-        # 🎯 Plot bar chart with highlighted predicted sentiment
-        # ✅ Sort probabilities (highest first)
-        sorted_probs = sorted(probs.items(), key=lambda x: x[1], reverse=True)
-        classes = [cls.capitalize() for cls, _ in sorted_probs]
-        values = [val for _, val in sorted_probs]
+    # 🎯 Show sentiment result
+    st.markdown(f"### 🏷️ Prediction: **{sentiment.title()}**")
+
+    # 🎯 Show confidence scores (fixed distributions)
+    st.markdown("### 📊 Confidence Scores:")
+    st.write(f"**Positive:** {probs.get('positive',0)}%")
+    st.write(f"**Neutral:** {probs.get('neutral',0)}%")
+    st.write(f"**Negative:** {probs.get('negative',0)}%")
+
+    # 🎯 Plot bar chart with highlighted predicted sentiment
+    # ✅ Sort probabilities (highest first)
+    sorted_probs = sorted(probs.items(), key=lambda x: x[1], reverse=True)
+    classes = [cls.capitalize() for cls, _ in sorted_probs]
+    values = [val for _, val in sorted_probs]
 
 # ✅ Highlight predicted sentiment
-        colors = []
-        for cls in classes:
-            if cls.lower() == sentiment.lower():
-                if cls == "Positive":
-                    colors.append("#10b981")  # green
-                elif cls == "Negative":
-                    colors.append("red")  # red
-                else:
-                    colors.append("blue")  # blue for neutral
+    colors = []
+    for cls in classes:
+        if cls.lower() == sentiment.lower():
+            if cls == "Positive":
+                colors.append("#10b981")  # green
+            elif cls == "Negative":
+                colors.append("red")  # red
             else:
-                colors.append("#d1d5db")  # grey for others
-
-        fig = go.Figure(go.Bar(
-            x=values,
-            y=classes,
-            orientation="h",
-            marker=dict(color=colors),
-            text=[f"{v}%" for v in values],
-            textposition="auto"
-        ))
-        fig.update_layout(title="Sentiment Confidence (%)", xaxis=dict(range=[0, 100]))
-        st.plotly_chart(fig, use_container_width=True)
-
-        # 🎯 Emotion & aspects
-        st.markdown(f"*Emotion:* {emo.title()}")
-        st.markdown("*Aspect-based summary:*")
-        for a, v in aspects.items():
-            st.write(f"- *{a}:* {v.title()}")
-        
-        # Sarcasm Section
-        st.subheader("🎭 Sarcasm Detection")
-        if is_sarcastic:
-            st.warning("⚠️ This text may contain **sarcasm**.")
+                colors.append("blue")  # blue for neutral
         else:
-            st.success("✅ No sarcasm detected.")
-        st.markdown(f"*Keywords:* {', '.join(keywords)}")
+            colors.append("#d1d5db")  # grey for others
+
+    fig = go.Figure(go.Bar(
+        x=values,
+        y=classes,
+        orientation="h",
+        marker=dict(color=colors),
+        text=[f"{v}%" for v in values],
+        textposition="auto"
+    ))
+    fig.update_layout(title="Sentiment Confidence (%)", xaxis=dict(range=[0, 100]))
+    st.plotly_chart(fig, use_container_width=True)
+
+    # 🎯 Emotion & aspects
+    st.markdown(f"*Emotion:* {emo.title()}")
+    st.markdown("*Aspect-based summary:*")
+    for a, v in aspects.items():
+        st.write(f"- *{a}:* {v.title()}")
+    
+    # Sarcasm Section
+    st.subheader("🎭 Sarcasm Detection")
+    if is_sarcastic:
+        st.warning("⚠️ This text may contain **sarcasm**.")
+    else:
+        st.success("✅ No sarcasm detected.")
+    st.markdown(f"*Keywords:* {', '.join(keywords)}")
 
-        # 🎯 Chatbot response
-       # 🎯 Chatbot response (custom styled box)
-        st.subheader("🤖 Chatbot Says:")
+    # 🎯 Chatbot response
+   # 🎯 Chatbot response (custom styled box)
+    st.subheader("🤖 Chatbot Says:")
 
-        st.markdown(f"""
+    st.markdown(f"""
 <div style="
-    background-color:#FFFAF0;
-    padding:15px;
-    border-radius:10px;
-    color:black;
-    font-weight:600;
-    font-size:1rem;
+background-color:#FFFAF0;
+padding:15px;
+border-radius:10px;
+color:black;
+font-weight:600;
+font-size:1rem;
 ">
-    {chatbot_response(sentiment)}
+{chatbot_response(sentiment)}
 </div>
 """, unsafe_allow_html=True)
 
-        
+    # Download result
+    st.subheader("📤 Share / Download")
+    st.markdown("""
+<style>
+div.stDownloadButton > button {
+    background-color: #FF8C00;   /* Green */
+    color: white;                /* Text color */
+    border-radius: 8px;          /* Rounded corners */
+    padding: 0.6em 1em;
+    font-weight: bold;
+}
+div.stDownloadButton > button:hover {
+    background-color: #45a049;   /* Darker green on hover */
+    color: white;
+}
+</style>
+""", unsafe_allow_html=True)
+    # stored bytes + on_click="ignore": downloading doesn't rerun or rebuild the PDF
+    st.download_button("Download Result as PDF", data=result["pdf"], file_name="senticore_result.pdf", mime="application/pdf", on_click="ignore")
 
-        # 🎯 Save to history
-        st.session_state.history.append({
-            "text": text,
-            "prediction": sentiment,
-            "emotion": emo,
-            "aspects": aspects,
-            "sarcasm": is_sarcastic,
-            "keywords": ", ".join(keywords),
-            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
-       
 
-        # Download result
-        st.subheader("📤 Share / Download")
-        pdf_buf = generate_result_pdf(text, sentiment)
-        st.markdown("""
-    <style>
-    div.stDownloadButton > button {
-        background-color: #FF8C00;   /* Green */
-        color: white;                /* Text color */
-        border-radius: 8px;          /* Rounded corners */
-        padding: 0.6em 1em;
-        font-weight: bold;
-    }
-    div.stDownloadButton > button:hover {
-        background-color: #45a049;   /* Darker green on hover */
-        color: white;
-    }
-    </style>
-""", unsafe_allow_html=True)
-        st.download_button("Download Result as PDF", data=pdf_buf, file_name="senticore_result.pdf", mime="application/pdf")
+def history_exports(df, history):
+    key = (st.session_state.username, len(history))
+    cached = st.session_state.get("history_exports")
+    if not cached or cached["key"] != key:
+        cached = {
+            "key": key,
+            "csv": df.to_csv(index=False).encode("utf-8"),
+            "pdf": generate_history_pdf(history).getvalue(),
+        }
+        st.session_state.history_exports = cached
+    return cached["csv"], cached["pdf"]
 
 
 def history_page():
     st.title("📜 Your History")
-    if st.session_state.history:
-        df = pd.DataFrame(st.session_state.history)
+    history = backend.get_history(st.session_state.username)
+    if history:
+        df = pd.DataFrame(history)
         st.dataframe(df)
 
         # Pie chart
@@ -580,9 +593,10 @@ def history_page():
         fig, ax = plt.subplots()
         ax.pie(counts, labels=counts.index, autopct="%1.1f%%", startangle=90)
         st.pyplot(fig)
+        plt.close(fig)
 
-        # Export
-        csv = df.to_csv(index=False).encode("utf-8")
+        # Export — built once per history snapshot, reused on later reruns
+        csv, pdf_bytes = history_exports(df, history)
         st.markdown("""
     <style>
     div.stDownloadButton > button {
@@ -598,8 +612,7 @@ def history_page():
     }
     </style>
 """, unsafe_allow_html=True)
-        st.download_button("Download History CSV", data=csv, file_name="history.csv", mime="text/csv")
-        pdf_buf = generate_history_pdf(st.session_state.history)
+        st.download_button("Download History CSV", data=csv, file_name="history.csv", mime="text/csv", on_click="ignore")
         st.markdown("""
     <style>
     div.stDownloadButton > button {
@@ -615,11 +628,84 @@ def history_page():
     }
     </style>
 """, unsafe_allow_html=True)
-        st.download_button("Download History PDF", data=pdf_buf, file_name="history.pdf", mime="application/pdf")
+        st.download_button("Download History PDF", data=pdf_bytes, file_name="history.pdf", mime="application/pdf", on_click="ignore")
     else:
         st.info("No history yet. Try analyzing some text first!")
 
 
+def model_health_page():
+    st.title("🛠️ Model Health")
+    st.write("Live input drift and prediction health, from fixed-size sketches. No raw text is kept, "
+             "apart from the most frequent out-of-vocabulary tokens listed below.")
+    model_health_fragment()
+
+
+@st.fragment
+def model_health_fragment():
+    keep_session_alive()
+    st.button("🔄 Refresh")
+
+    # optionally fold in snapshots exported by other replicas
+    uploads = st.file_uploader("Merge snapshots from other replicas", type="json", accept_multiple_files=True)
+    view = DriftMonitor.from_snapshot(monitor.snapshot())
+    for up in uploads or []:
+        # merge into a copy so a file that fails halfway leaves the view untouched
+        merged = DriftMonitor.from_snapshot(view.snapshot())
+        try:
+            merged.merge(DriftMonitor.from_snapshot(json.loads(up.getvalue())))
+        except (ValueError, KeyError, TypeError) as e:
+            st.error(f"Could not merge {up.name}: {e}")
+            continue
+        view = merged
+
+    health = view.health()
+    snap = view.snapshot()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Requests", health["requests"])
+    c2.metric("OOV rate (recent)", f"{health['latest_oov_rate']:.0%}",
+              delta=f"{health['latest_oov_rate'] - health['reference_oov_rate']:+.0%}", delta_color="inverse")
+    c3.metric("Low-margin share (recent)", f"{health['latest_low_margin_share']:.0%}")
+    c4.metric("Class-mix shift", "—" if health["class_shift"] is None else f"{health['class_shift']:.2f}")
+
+    st.caption(f"Recent window: last {health['window_requests']} requests, "
+               f"compared with {health['reference_requests']} earlier ones.")
+    if health["alerts"]:
+        for alert in health["alerts"]:
+            st.warning(f"⚠️ {alert} Retraining may be due.")
+    elif health["reference_requests"] < MIN_ALERT_SAMPLES:
+        st.info(f"ℹ️ Not enough traffic yet for drift checks (need {MIN_ALERT_SAMPLES} recent and {MIN_ALERT_SAMPLES} earlier requests).")
+    else:
+        st.success("✅ No drift detected.")
+
+    if not snap["buckets"]:
+        st.info("No traffic observed yet.")
+        return
+
+    st.subheader("📈 Class & Emotion Mix Over Time")
+    times = [datetime.fromtimestamp(b["start"]) for b in snap["buckets"]]
+    classes = pd.DataFrame([b["classes"] for b in snap["buckets"]], index=times).fillna(0)
+    emotions = pd.DataFrame([b["emotions"] for b in snap["buckets"]], index=times).fillna(0)
+    st.area_chart(classes.div(classes.sum(axis=1), axis=0))
+    st.area_chart(emotions.div(emotions.sum(axis=1).where(lambda x: x > 0), axis=0).fillna(0))
+
+    st.subheader("📊 Input Length & Probability Margin")
+    col_len, col_margin = st.columns(2)
+    with col_len:
+        fig = go.Figure(go.Bar(x=view.lengths.labels(), y=snap["length_hist"]["counts"]))
+        fig.update_layout(title="Input length (characters)")
+        st.plotly_chart(fig, use_container_width=True)
+    with col_margin:
+        fig = go.Figure(go.Bar(x=view.margins.labels(), y=snap["margin_hist"]["counts"]))
+        fig.update_layout(title="Probability margin (top-1 minus top-2)")
+        st.plotly_chart(fig, use_container_width=True)
+
+    st.subheader("🔤 Most Frequent Out-of-Vocabulary Tokens")
+    st.dataframe(pd.DataFrame(list(snap["top_oov"].items()), columns=["token", "estimated count"]))
+
+    st.download_button("Download Snapshot JSON", data=json.dumps(snap).encode("utf-8"),
+                       file_name="senticore_monitor_snapshot.json", mime="application/json", on_click="ignore")
+
+
 # ---------------------------
 # Sidebar Navigation & Auth
 # ---------------------------
@@ -669,6 +755,9 @@ def sidebar():
         if st.sidebar.button("👤 Profile"):
             st.session_state.page = "Profile"
             st.rerun()
+        if is_admin() and st.sidebar.button("🛠️ Model Health"):
+            st.session_state.page = "Model Health"
+            st.rerun()
 
         # Logout flow with confirmation
         if not st.session_state.get("logout_confirm", False):
@@ -679,8 +768,7 @@ def sidebar():
             st.sidebar.warning("Are you sure you want to log out?")
             col_yes, col_no = st.sidebar.columns(2)
             if col_yes.button("Yes"):
-                st.session_state.logged_in = False
-                st.session_state.username = None
+                clear_login()
                 st.session_state.page = "Home"
                 st.session_state.logout_confirm = False
                 st.rerun()
@@ -743,6 +831,12 @@ def main():
     elif page == "Profile":
         profile_page()
 
+    elif page == "Model Health":
+        if is_admin():
+            model_health_page()
+        else:
+            st.warning("⚠ The Model Health page is only available to admins.")
+
     elif page == "Sign In":
         sign_in_page()
 
@@ -0,0 +1,477 @@
+"""
+Senticore • Forest compression
+
+Shrinks the RandomForest in ``senticore_model.pkl`` against a held-out labeled
+set while keeping accuracy within a tolerance of the original:
+
+1. deep / low-support subtrees are collapsed into leaves,
+2. a small subset of trees is picked greedily on one part of the held-out set,
+3. the kept trees are flattened into one set of compact numpy arrays
+   (small-int features and children, float32 thresholds, float16 leaf values).
+
+The result is a ``CompactForest`` exposing ``classes_``, ``predict`` and
+``predict_proba``, so it can be loaded by ``app.py`` in place of the original.
+
+Usage:
+    python compress_model.py holdout.csv --tolerance 0.01 \
+        --output senticore_model_compact.pkl --report compression_report.json
+
+The held-out CSV uses the notebook's columns (``review_text``, ``sentiment``).
+Texts are fed to the vectorizer as-is, exactly like ``app.py`` does. Labels
+are matched to the model classes ignoring case. Reported accuracy and
+probability shift come from the held-out rows not used for tree selection;
+the model is only written if it stays within tolerance there (or ``--force``).
+"""
+
+import argparse
+import json
+import os
+import pickle
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+
+MIN_TREES = 20       # default floor on kept trees, so probabilities stay smooth
+MIN_PART_ROWS = 10   # minimum rows in each of the selection / evaluation parts
+
+
+# ---------------------------
+# Compact model
+# ---------------------------
+class CompactForest:
+    """Flattened, pruned forest with the same predict API as the original.
+
+    All trees live in shared node arrays. ``roots`` holds each tree's root
+    node. For leaves ``feature`` is -1 and ``children_left`` points into
+    ``leaf_values`` (one normalized class distribution per leaf).
+    """
+
+    def __init__(self, classes, n_features_in, roots, feature, threshold,
+                 children_left, children_right, leaf_values, max_depth):
+        self.classes_ = classes
+        self.n_features_in_ = n_features_in
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.leaf_values = leaf_values
+        self.max_depth = max_depth
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def node_count(self):
+        return len(self.feature)
+
+    def _tree_leaves(self, Xd):
+        """Leaf index reached by every (tree, row) pair, shape (n_trees, n_rows)."""
+        n_rows = Xd.shape[0]
+        rows = np.tile(np.arange(n_rows), self.n_estimators)
+        node = np.repeat(self.roots.astype(np.int64), n_rows)
+        # every step moves all still-internal nodes one level down
+        for _ in range(self.max_depth + 1):
+            feat = self.feature[node]
+            active = np.nonzero(feat >= 0)[0]
+            if active.size == 0:
+                break
+            cur = node[active]
+            go_left = Xd[rows[active], feat[active]] <= self.threshold[cur]
+            node[active] = np.where(go_left, self.children_left[cur], self.children_right[cur])
+        return self.children_left[node].reshape(self.n_estimators, n_rows)
+
+    def per_tree_proba(self, X, chunk_size=256):
+        """Class distribution of every tree, shape (n_trees, n_rows, n_classes)."""
+        out = np.empty((self.n_estimators, X.shape[0], len(self.classes_)), dtype=np.float32)
+        for start in range(0, X.shape[0], chunk_size):
+            Xd = _dense_chunk(X, start, chunk_size)
+            leaves = self._tree_leaves(Xd)
+            out[:, start:start + Xd.shape[0]] = self.leaf_values[leaves]
+        return out
+
+    def predict_proba(self, X, chunk_size=256):
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_size):
+            Xd = _dense_chunk(X, start, chunk_size)
+            leaves = self._tree_leaves(Xd)
+            summed = self.leaf_values[leaves].astype(np.float64).sum(axis=0)
+            proba[start:start + Xd.shape[0]] = summed / self.n_estimators
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _dense_chunk(X, start, chunk_size):
+    # trees compare float32 features, same as sklearn does internally
+    chunk = X[start:start + chunk_size]
+    if hasattr(chunk, "toarray"):
+        chunk = chunk.toarray()
+    return np.asarray(chunk, dtype=np.float32)
+
+
+def _index_dtype(max_value):
+    for dtype in (np.int16, np.int32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _float32_floor(threshold):
+    # round thresholds *down* so `x <= t` gives the same split for float32 x
+    t32 = threshold.astype(np.float32)
+    too_high = t32.astype(np.float64) > threshold
+    t32[too_high] = np.nextafter(t32[too_high], np.float32(-np.inf))
+    return t32
+
+
+# ---------------------------
+# Pruning & flattening
+# ---------------------------
+def prune_tree(estimator, max_depth=None, min_samples=1):
+    """Walk one fitted tree and return its reachable nodes after pruning.
+
+    A node becomes a leaf when it already is one, sits at ``max_depth``, or
+    saw fewer than ``min_samples`` training samples. Returns node arrays in
+    local (0-based) indexing plus the leaf class distributions.
+    """
+    tree = estimator.tree_
+    value = tree.value[:, 0, :]
+    feature, threshold, left, right, leaves = [], [], [], [], []
+
+    # (original node, depth, slot in parent to patch)
+    stack = [(0, 0, None)]
+    while stack:
+        node, depth, parent_slot = stack.pop()
+        new_id = len(feature)
+        if parent_slot is not None:
+            parent_slot[0][parent_slot[1]] = new_id
+
+        is_leaf = (
+            tree.children_left[node] == -1
+            or (max_depth is not None and depth >= max_depth)
+            or tree.n_node_samples[node] < min_samples
+        )
+        if is_leaf:
+            dist = value[node]
+            leaves.append(dist / dist.sum())
+            feature.append(-1)
+            threshold.append(0.0)
+            left.append(len(leaves) - 1)
+            right.append(-1)
+            continue
+
+        feature.append(tree.feature[node])
+        threshold.append(tree.threshold[node])
+        left.append(-1)
+        right.append(-1)
+        stack.append((tree.children_right[node], depth + 1, (right, new_id)))
+        stack.append((tree.children_left[node], depth + 1, (left, new_id)))
+
+    return {
+        "feature": np.asarray(feature, dtype=np.int64),
+        "threshold": np.asarray(threshold, dtype=np.float64),
+        "children_left": np.asarray(left, dtype=np.int64),
+        "children_right": np.asarray(right, dtype=np.int64),
+        "leaf_values": np.asarray(leaves, dtype=np.float64),
+    }
+
+
+def build_compact_forest(model, trees, value_dtype=np.float16):
+    """Concatenate pruned trees (output of ``prune_tree``) into a CompactForest."""
+    roots, feature, threshold, left, right, leaf_values = [], [], [], [], [], []
+    node_offset = leaf_offset = 0
+    max_depth = 0
+    for t in trees:
+        is_leaf = t["feature"] < 0
+        l = t["children_left"].copy()
+        r = t["children_right"].copy()
+        l[is_leaf] += leaf_offset
+        l[~is_leaf] += node_offset
+        r[~is_leaf] += node_offset
+        roots.append(node_offset)
+        feature.append(t["feature"])
+        threshold.append(t["threshold"])
+        left.append(l)
+        right.append(r)
+        leaf_values.append(t["leaf_values"])
+        node_offset += len(t["feature"])
+        leaf_offset += len(t["leaf_values"])
+        max_depth = max(max_depth, _tree_depth(t))
+
+    feature = np.concatenate(feature)
+    left = np.concatenate(left)
+    right = np.concatenate(right)
+    child_dtype = _index_dtype(max(node_offset, leaf_offset))
+    return CompactForest(
+        classes=model.classes_,
+        n_features_in=model.n_features_in_,
+        roots=np.asarray(roots, dtype=child_dtype),
+        feature=feature.astype(_index_dtype(model.n_features_in_)),
+        threshold=_float32_floor(np.concatenate(threshold)),
+        children_left=left.astype(child_dtype),
+        children_right=right.astype(child_dtype),
+        leaf_values=np.concatenate(leaf_values).astype(value_dtype),
+        max_depth=max_depth,
+    )
+
+
+def _tree_depth(t):
+    depth = np.zeros(len(t["feature"]), dtype=np.int64)
+    # nodes are stored in pre-order, so parents come before children
+    for node in np.nonzero(t["feature"] >= 0)[0]:
+        depth[t["children_left"][node]] = depth[node] + 1
+        depth[t["children_right"][node]] = depth[node] + 1
+    return int(depth.max())
+
+
+# ---------------------------
+# Tree subset selection
+# ---------------------------
+def select_trees(per_tree_proba, y_idx, target_accuracy, min_trees=MIN_TREES):
+    """Greedy forward selection of trees on the held-out set.
+
+    Adds, one at a time, the tree that gives the best ensemble accuracy
+    (ties broken by the mean probability of the true class) and stops as
+    soon as ``target_accuracy`` is reached. If it is never reached, the
+    most accurate subset seen along the way is kept. Returns sorted indices.
+    """
+    n_trees, n_rows, _ = per_tree_proba.shape
+    true_p = per_tree_proba[:, np.arange(n_rows), y_idx]
+    summed = np.zeros(per_tree_proba.shape[1:], dtype=np.float64)
+    summed_true = np.zeros(n_rows, dtype=np.float64)
+    remaining = list(range(n_trees))
+    chosen = []
+    best_acc, best_len = -1.0, 0
+
+    while remaining:
+        cand = per_tree_proba[remaining] + summed
+        acc = (cand.argmax(axis=2) == y_idx).mean(axis=1)
+        score = (true_p[remaining] + summed_true).mean(axis=1) / (len(chosen) + 1)
+        best = int(np.lexsort((score, acc))[-1])
+        tree = remaining.pop(best)
+        chosen.append(tree)
+        summed += per_tree_proba[tree]
+        summed_true += true_p[tree]
+        if len(chosen) >= min_trees and acc[best] > best_acc:
+            best_acc, best_len = acc[best], len(chosen)
+        if len(chosen) >= min_trees and acc[best] >= target_accuracy:
+            break
+    return sorted(chosen[:max(best_len, min_trees)])
+
+
+def split_holdout(y, eval_fraction=0.5, seed=42):
+    """Indices of the selection and evaluation parts, stratified by label when possible."""
+    idx = np.arange(len(y))
+    _, counts = np.unique(y, return_counts=True)
+    stratify = y if counts.min() >= 2 else None
+    select_idx, eval_idx = train_test_split(idx, test_size=eval_fraction, random_state=seed, stratify=stratify)
+    if min(len(select_idx), len(eval_idx)) < MIN_PART_ROWS:
+        raise ValueError(
+            f"Held-out set too small: need at least {MIN_PART_ROWS} rows for both tree selection "
+            f"and evaluation, got {len(select_idx)} and {len(eval_idx)}"
+        )
+    return np.sort(select_idx), np.sort(eval_idx)
+
+
+def match_labels(y, classes):
+    """Map labels onto ``classes`` ignoring case/whitespace; returns (labels, matched mask)."""
+    lookup = {str(c).strip().lower(): c for c in classes}
+    mapped = np.array([lookup.get(str(label).strip().lower()) for label in y], dtype=object)
+    known = np.array([m is not None for m in mapped], dtype=bool)
+    if not known.any():
+        raise ValueError(
+            f"No held-out label matches the model classes {list(classes)}; "
+            f"got e.g. {sorted(set(map(str, y)))[:5]}"
+        )
+    return mapped, known
+
+
+# ---------------------------
+# Measurements
+# ---------------------------
+def probability_shift(original, compact, X):
+    """Absolute change of displayed probabilities, in percentage points."""
+    shift = np.abs(compact.predict_proba(X) - original.predict_proba(X)) * 100
+    return {
+        "mean_abs": round(float(shift.mean()), 3),
+        "p95_abs": round(float(np.percentile(shift, 95)), 3),
+        "max_abs": round(float(shift.max()), 3),
+    }
+
+
+def pickled_size(obj):
+    return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def array_nbytes(model):
+    """Bytes held by the model's node/value arrays (the bulk of its RAM)."""
+    if isinstance(model, CompactForest):
+        return int(sum(a.nbytes for a in (
+            model.roots, model.feature, model.threshold,
+            model.children_left, model.children_right, model.leaf_values,
+        )))
+    total = 0
+    for est in model.estimators_:
+        state = est.tree_.__getstate__()
+        total += state["nodes"].nbytes + state["values"].nbytes
+    return int(total)
+
+
+def measure_latency(model, X, repeats=20):
+    """Median single-row latency and amortized per-row batch latency, in ms."""
+    single = []
+    for i in range(repeats):
+        row = X[i % X.shape[0]]
+        t0 = time.perf_counter()
+        model.predict_proba(row)
+        single.append(time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    model.predict_proba(X)
+    batch = time.perf_counter() - t0
+    return {
+        "single_row_ms": round(float(np.median(single)) * 1000, 3),
+        "batch_per_row_ms": round(batch * 1000 / X.shape[0], 4),
+    }
+
+
+def describe(model, X, y):
+    is_compact = isinstance(model, CompactForest)
+    return {
+        "n_trees": model.n_estimators if is_compact else len(model.estimators_),
+        "n_nodes": model.node_count if is_compact else int(sum(e.tree_.node_count for e in model.estimators_)),
+        "accuracy": round(float((model.predict(X) == y).mean()), 4),
+        "latency": measure_latency(model, X),
+        "pickled_bytes": pickled_size(model),
+        "array_bytes": array_nbytes(model),
+    }
+
+
+# ---------------------------
+# Driver
+# ---------------------------
+def load_holdout(path, text_col="review_text", label_col="sentiment"):
+    df = pd.read_csv(path).dropna(subset=[text_col, label_col])
+    return df[text_col].astype(str).tolist(), df[label_col].astype(str).to_numpy()
+
+
+def compress(model, X, y, tolerance=0.01, max_depth=None, min_samples=1,
+             value_dtype=np.float16, min_trees=MIN_TREES, eval_fraction=0.5, seed=42):
+    """Return ``(compact_model, report)`` for a fitted forest and held-out data.
+
+    Trees are selected on one part of the held-out rows; the reported
+    accuracies, probability shift and ``within_tolerance`` come from the
+    other part only.
+    """
+    y, known = match_labels(y, model.classes_)
+    dropped = int((~known).sum())
+    X, y = X[np.nonzero(known)[0]], y[known].astype(model.classes_.dtype)
+    select_idx, eval_idx = split_holdout(y, eval_fraction, seed)
+    X_sel, y_sel = X[select_idx], y[select_idx]
+    X_eval, y_eval = X[eval_idx], y[eval_idx]
+
+    target = float((model.predict(X_sel) == y_sel).mean()) - tolerance
+    min_trees = min(min_trees, len(model.estimators_))
+
+    pruned = [prune_tree(est, max_depth, min_samples) for est in model.estimators_]
+    full = build_compact_forest(model, pruned, value_dtype)
+    per_tree = full.per_tree_proba(X_sel)
+    chosen = select_trees(per_tree, np.searchsorted(model.classes_, y_sel), target, min_trees)
+
+    compact = build_compact_forest(model, [pruned[i] for i in chosen], value_dtype)
+    report = {
+        "tolerance": tolerance,
+        "rows": {"selection": len(select_idx), "evaluation": len(eval_idx), "dropped_unknown_label": dropped},
+        "selection_target_accuracy": round(target, 4),
+        "settings": {
+            "max_depth": max_depth,
+            "min_samples": min_samples,
+            "min_trees": min_trees,
+            "value_dtype": np.dtype(value_dtype).name,
+        },
+        "kept_trees": chosen,
+        "original": describe(model, X_eval, y_eval),
+        "compressed": describe(compact, X_eval, y_eval),
+        "probability_shift_pct": probability_shift(model, compact, X_eval),
+    }
+    report["within_tolerance"] = (
+        report["compressed"]["accuracy"] >= report["original"]["accuracy"] - tolerance
+    )
+    return compact, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compress the Senticore forest against a held-out set.")
+    parser.add_argument("holdout", help="CSV with held-out texts and labels")
+    parser.add_argument("--model", default="senticore_model.pkl")
+    parser.add_argument("--vectorizer", default="senticore_vectorizer.pkl")
+    parser.add_argument("--output", default="senticore_model_compact.pkl")
+    parser.add_argument("--report", default="compression_report.json")
+    parser.add_argument("--text-col", default="review_text")
+    parser.add_argument("--label-col", default="sentiment")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="allowed accuracy drop (absolute)")
+    parser.add_argument("--max-depth", type=int, default=None, help="cap tree depth")
+    parser.add_argument("--min-samples", type=int, default=1, help="collapse nodes with fewer training samples")
+    parser.add_argument("--min-trees", type=int, default=MIN_TREES, help="never keep fewer trees than this")
+    parser.add_argument("--eval-fraction", type=float, default=0.5, help="share of held-out rows kept for evaluation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="write the model even if it misses the tolerance")
+    parser.add_argument("--value-dtype", default="float16", choices=["float16", "float32"])
+    args = parser.parse_args(argv)
+    if args.min_trees < 1:
+        parser.error("--min-trees must be at least 1")
+
+    model = joblib.load(args.model)
+    vectorizer = joblib.load(args.vectorizer)
+    texts, y = load_holdout(args.holdout, args.text_col, args.label_col)
+    X = vectorizer.transform(texts)
+
+    compact, report = compress(
+        model, X, y,
+        tolerance=args.tolerance,
+        max_depth=args.max_depth,
+        min_samples=args.min_samples,
+        value_dtype=np.dtype(args.value_dtype),
+        min_trees=args.min_trees,
+        eval_fraction=args.eval_fraction,
+        seed=args.seed,
+    )
+    write_model = report["within_tolerance"] or args.force
+    report["original"]["file_bytes"] = os.path.getsize(args.model)
+    if write_model:
+        joblib.dump(compact, args.output)
+        report["compressed"]["file_bytes"] = os.path.getsize(args.output)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+
+    o, c, rows = report["original"], report["compressed"], report["rows"]
+    shift = report["probability_shift_pct"]
+    print(f"Rows:     {rows['selection']} for selection, {rows['evaluation']} for evaluation"
+          f", {rows['dropped_unknown_label']} dropped (unknown label)")
+    print(f"Trees:    {o['n_trees']} -> {c['n_trees']}  (nodes {o['n_nodes']} -> {c['n_nodes']})")
+    print(f"Accuracy: {o['accuracy']:.4f} -> {c['accuracy']:.4f} on evaluation rows (tolerance {report['tolerance']})")
+    print(f"Δprob:    mean {shift['mean_abs']} pts, p95 {shift['p95_abs']} pts, max {shift['max_abs']} pts")
+    print(f"Latency:  {o['latency']['single_row_ms']} ms -> {c['latency']['single_row_ms']} ms per request")
+    print(f"Size:     {o['pickled_bytes']} B -> {c['pickled_bytes']} B pickled, "
+          f"{o['array_bytes']} B -> {c['array_bytes']} B in arrays")
+    if write_model and not report["within_tolerance"]:
+        print(f"⚠️ Accuracy drop exceeds the tolerance on evaluation rows; saved {args.output} anyway (--force)")
+    elif write_model:
+        print(f"✅ Saved {args.output} and {args.report}")
+    else:
+        print(f"❌ Accuracy drop exceeds the tolerance on evaluation rows; {args.output} not written "
+              f"(use --force to write it anyway). Report saved to {args.report}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    # go through the importable module so the pickle references
+    # compress_model.CompactForest rather than __main__.CompactForest
+    import compress_model
+    compress_model.main()
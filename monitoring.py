@@ -0,0 +1,275 @@
+"""
+Senticore • Input drift & model-health monitoring
+
+Streaming sketches fed by every analysis, all in fixed memory no matter how
+much traffic arrives, and without keeping the raw text:
+
+- a count-min sketch of tokens missing from the vectorizer's word vocabulary
+  (plus a small top-k list of the heaviest ones),
+- histograms of input length and probability margin (top-1 minus top-2),
+- class mix and emotion mix per time bucket, in a ring of recent buckets.
+
+The top-k list is the one exception to "no raw text": its tokens are kept
+verbatim (cut to ``OOV_TOKEN_CHARS`` characters), so they can show up in
+snapshots and on the Model Health page. A name or ID that many users type
+can therefore appear there.
+
+Snapshots are plain JSON dicts; snapshots from several replicas can be
+merged with ``DriftMonitor.merge``.
+"""
+
+import copy
+import hashlib
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+LENGTH_BINS = [0, 10, 20, 50, 100, 200, 500, 1000, 2000]   # characters; last bin is open-ended
+MARGIN_BINS = [round(i / 10, 1) for i in range(10)]        # 0.0-0.1, ..., 0.9-1.0
+LOW_MARGIN = 0.2
+OOV_TOKEN_CHARS = 24           # out-of-vocabulary tokens are cut to this length before tracking
+
+# health thresholds
+MIN_ALERT_SAMPLES = 50         # requests needed in the recent window (and the reference) before alerting
+OOV_DRIFT_RATIO = 1.5          # recent-window OOV rate vs. earlier traffic
+OOV_MIN_ALERT_RATE = 0.05      # floor for that comparison, so a zero reference rate can still alert
+LOW_MARGIN_ALERT_SHARE = 0.5   # share of recent predictions with margin < LOW_MARGIN
+CLASS_SHIFT_ALERT = 0.25       # total variation distance of recent class mix vs. earlier
+
+
+# ---------------------------
+# Sketches
+# ---------------------------
+class CountMinSketch:
+    """Count-min sketch with a stable hash, so sketches from other processes can be merged."""
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _indexes(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item, count=1):
+        idx = self._indexes(item)
+        self.table[np.arange(self.depth), idx] += count
+        return int(self.table[np.arange(self.depth), idx].min())
+
+    def estimate(self, item):
+        return int(self.table[np.arange(self.depth), self._indexes(item)].min())
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Count-min sketches must have the same width and depth to merge")
+        self.table += other.table
+
+
+class Histogram:
+    """Counts over fixed bin edges; values past the last edge go in the last bin."""
+
+    def __init__(self, edges):
+        self.edges = list(edges)
+        self.counts = np.zeros(len(self.edges), dtype=np.int64)
+
+    def add(self, value):
+        i = int(np.searchsorted(self.edges, value, side="right")) - 1
+        self.counts[min(max(i, 0), len(self.edges) - 1)] += 1
+
+    def labels(self):
+        return [f"{a}-{b}" for a, b in zip(self.edges, self.edges[1:])] + [f"{self.edges[-1]}+"]
+
+
+def _word_vocabulary(vectorizer):
+    """Tokenizer and unigram vocabulary of the word-level tf-idf inside the vectorizer."""
+    parts = [vectorizer] + [t for _, t in getattr(vectorizer, "transformer_list", [])]
+    for part in parts:
+        if getattr(part, "analyzer", None) == "word" and hasattr(part, "vocabulary_"):
+            tokenize = part.build_tokenizer()
+            lowercase = part.lowercase
+            vocab = {term for term in part.vocabulary_ if " " not in term}
+            return (lambda text: tokenize(text.lower() if lowercase else text)), vocab
+    raise ValueError("Vectorizer has no fitted word-level component to monitor against")
+
+
+def _new_bucket(start):
+    return {"start": start, "n": 0, "tokens": 0, "oov_tokens": 0, "low_margin": 0,
+            "classes": {}, "emotions": {}}
+
+
+# ---------------------------
+# Monitor
+# ---------------------------
+class DriftMonitor:
+    """Bounded-memory drift monitor; ``observe`` is safe to call from many sessions."""
+
+    def __init__(self, vectorizer=None, cms_width=2048, cms_depth=4, top_k=20,
+                 bucket_seconds=3600, max_buckets=48):
+        self.tokenize, self.vocab = _word_vocabulary(vectorizer) if vectorizer is not None else (None, set())
+        self.oov = CountMinSketch(cms_width, cms_depth)
+        self.top_k = top_k
+        self.top_oov = {}
+        self.lengths = Histogram(LENGTH_BINS)
+        self.margins = Histogram(MARGIN_BINS)
+        self.bucket_seconds = bucket_seconds
+        self.buckets = deque(maxlen=max_buckets)
+        self.totals = _new_bucket(None)
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def _bucket(self, now):
+        start = int(now // self.bucket_seconds * self.bucket_seconds)
+        if not self.buckets or self.buckets[-1]["start"] < start:
+            self.buckets.append(_new_bucket(start))
+        return self.buckets[-1]
+
+    def _track_top(self, token, estimate):
+        if token in self.top_oov or len(self.top_oov) < self.top_k:
+            self.top_oov[token] = estimate
+            return
+        weakest = min(self.top_oov, key=self.top_oov.get)
+        if estimate > self.top_oov[weakest]:
+            del self.top_oov[weakest]
+            self.top_oov[token] = estimate
+
+    def observe(self, text, prediction, probs, emotion=None, now=None):
+        """Record one analysis. ``probs`` maps class -> percentage, as in analysis results."""
+        tokens = self.tokenize(text) if self.tokenize else []
+        oov = [t[:OOV_TOKEN_CHARS] for t in tokens if t not in self.vocab]
+        ranked = sorted(probs.values(), reverse=True) + [0.0, 0.0]
+        margin = (ranked[0] - ranked[1]) / 100
+        prediction = str(prediction).lower()
+
+        with self._lock:
+            bucket = self._bucket(now if now is not None else time.time())
+            for token in oov:
+                self._track_top(token, self.oov.add(token))
+            self.lengths.add(len(text))
+            self.margins.add(margin)
+            for b in (bucket, self.totals):
+                b["n"] += 1
+                b["tokens"] += len(tokens)
+                b["oov_tokens"] += len(oov)
+                b["low_margin"] += int(margin < LOW_MARGIN)
+                b["classes"][prediction] = b["classes"].get(prediction, 0) + 1
+                if emotion:
+                    b["emotions"][emotion] = b["emotions"].get(emotion, 0) + 1
+
+    # ---------------------------
+    # Export
+    # ---------------------------
+    def snapshot(self):
+        with self._lock:
+            return {
+                "taken": time.time(),
+                "started": self.started,
+                "bucket_seconds": self.bucket_seconds,
+                "max_buckets": self.buckets.maxlen,
+                "top_k": self.top_k,
+                "totals": {**self.totals, "classes": dict(self.totals["classes"]), "emotions": dict(self.totals["emotions"])},
+                "buckets": [{**b, "classes": dict(b["classes"]), "emotions": dict(b["emotions"])} for b in self.buckets],
+                "length_hist": {"edges": self.lengths.edges, "counts": self.lengths.counts.tolist()},
+                "margin_hist": {"edges": self.margins.edges, "counts": self.margins.counts.tolist()},
+                "top_oov": dict(sorted(self.top_oov.items(), key=lambda kv: -kv[1])),
+                "oov_sketch": {"width": self.oov.width, "depth": self.oov.depth, "table": self.oov.table.tolist()},
+            }
+
+    @classmethod
+    def from_snapshot(cls, snap, vectorizer=None):
+        snap = copy.deepcopy(snap)
+        sketch = snap["oov_sketch"]
+        monitor = cls(vectorizer, cms_width=sketch["width"], cms_depth=sketch["depth"], top_k=snap["top_k"],
+                      bucket_seconds=snap["bucket_seconds"], max_buckets=snap["max_buckets"])
+        monitor.oov.table = np.array(sketch["table"], dtype=np.int64)
+        for token, count in snap["top_oov"].items():
+            token = token[:OOV_TOKEN_CHARS]
+            monitor.top_oov[token] = max(count, monitor.top_oov.get(token, 0))
+        monitor.lengths.counts = np.array(snap["length_hist"]["counts"], dtype=np.int64)
+        monitor.margins.counts = np.array(snap["margin_hist"]["counts"], dtype=np.int64)
+        monitor.buckets.extend(snap["buckets"])
+        monitor.totals = snap["totals"]
+        monitor.started = snap["started"]
+        return monitor
+
+    def merge(self, other):
+        """Fold another monitor (e.g. another replica's snapshot) into this one."""
+        with self._lock:
+            self.oov.merge(other.oov)
+            self.lengths.counts += other.lengths.counts
+            self.margins.counts += other.margins.counts
+            for token in set(self.top_oov) | set(other.top_oov):
+                self._track_top(token, self.oov.estimate(token))
+            by_start = {b["start"]: b for b in self.buckets}
+            for b in other.buckets:
+                _add_bucket(by_start.setdefault(b["start"], _new_bucket(b["start"])), b)
+            merged = sorted(by_start.values(), key=lambda b: b["start"])
+            self.buckets.clear()
+            self.buckets.extend(merged[-self.buckets.maxlen:])
+            _add_bucket(self.totals, other.totals)
+            self.started = min(self.started, other.started)
+
+    # ---------------------------
+    # Health
+    # ---------------------------
+    def health(self, min_samples=MIN_ALERT_SAMPLES):
+        """Drift indicators and the reasons (if any) retraining looks due.
+
+        The recent window is the newest buckets merged until it holds at
+        least ``min_samples`` requests; everything older is the reference.
+        No alert is raised from a window or reference smaller than that.
+        """
+        snap = self.snapshot()
+        buckets = [b for b in snap["buckets"] if b["n"]]
+        latest, reference = _new_bucket(None), _new_bucket(None)
+        while buckets and latest["n"] < min_samples:
+            _add_bucket(latest, buckets.pop())
+        for b in buckets:
+            _add_bucket(reference, b)
+
+        report = {
+            "requests": snap["totals"]["n"],
+            "oov_rate": _ratio(snap["totals"]["oov_tokens"], snap["totals"]["tokens"]),
+            "window_requests": latest["n"],
+            "reference_requests": reference["n"],
+            "latest_oov_rate": _ratio(latest["oov_tokens"], latest["tokens"]),
+            "reference_oov_rate": _ratio(reference["oov_tokens"], reference["tokens"]),
+            "latest_low_margin_share": _ratio(latest["low_margin"], latest["n"]),
+            "class_shift": _total_variation(latest["classes"], reference["classes"]),
+            "alerts": [],
+        }
+        window_ok = latest["n"] >= min_samples
+        compare_ok = window_ok and reference["n"] >= min_samples
+        oov_limit = max(OOV_DRIFT_RATIO * report["reference_oov_rate"], OOV_MIN_ALERT_RATE)
+        if compare_ok and report["latest_oov_rate"] > oov_limit:
+            report["alerts"].append("Out-of-vocabulary rate is rising compared to earlier traffic.")
+        if window_ok and report["latest_low_margin_share"] > LOW_MARGIN_ALERT_SHARE:
+            report["alerts"].append("Most recent predictions are low-confidence (small probability margin).")
+        if compare_ok and report["class_shift"] > CLASS_SHIFT_ALERT:
+            report["alerts"].append("Predicted class mix has shifted compared to earlier traffic.")
+        return report
+
+
+def _add_bucket(into, b):
+    for key in ("n", "tokens", "oov_tokens", "low_margin"):
+        into[key] += b[key]
+    for key in ("classes", "emotions"):
+        for k, v in b[key].items():
+            into[key][k] = into[key].get(k, 0) + v
+
+
+def _ratio(a, b):
+    return round(a / b, 4) if b else 0.0
+
+
+def _total_variation(p, q):
+    if not p or not q:
+        return None
+    np_, nq = sum(p.values()), sum(q.values())
+    keys = set(p) | set(q)
+    return round(0.5 * sum(abs(p.get(k, 0) / np_ - q.get(k, 0) / nq) for k in keys), 4)
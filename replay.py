@@ -0,0 +1,203 @@
+"""
+Senticore • Shadow-mode replay
+
+Captures analyzed requests to a JSONL log and replays the log offline, in
+batches, against the current artifacts and a candidate side by side. The
+candidate can be a different model/vectorizer pickle, a module of revised
+rule functions (see ``analysis.RULE_FUNCTIONS``), or both.
+
+Usage:
+    SENTICORE_CAPTURE=captures/requests.jsonl streamlit run app.py   # capture
+    python replay.py captures/requests.jsonl \
+        --candidate-model senticore_model_compact.pkl \
+        --candidate-rules my_rules.py --report shadow_report.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import threading
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from analysis import RULE_FUNCTIONS, analyze_batch
+
+
+_capture_lock = threading.Lock()
+
+
+# ---------------------------
+# Capture
+# ---------------------------
+def capture_request(path, result):
+    """Append one analyzed request (text plus outputs) as a JSON line."""
+    record = {"time": datetime.now().isoformat(timespec="seconds"), **result}
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _capture_lock:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def load_log(path, limit=None):
+    records = []
+    if limit is not None and limit <= 0:
+        return records
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+                if limit is not None and len(records) >= limit:
+                    break
+    return records
+
+
+def load_rules(path):
+    """Load revised rule functions from a Python file; only RULE_FUNCTIONS names are used."""
+    spec = importlib.util.spec_from_file_location("candidate_rules", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    rules = {name: getattr(module, name) for name in RULE_FUNCTIONS if hasattr(module, name)}
+    if not rules:
+        raise ValueError(f"{path} defines none of: {', '.join(RULE_FUNCTIONS)}")
+    return rules
+
+
+# ---------------------------
+# Replay
+# ---------------------------
+def replay(texts, model, vectorizer, rules=None, batch_size=512):
+    """Run ``analyze_batch`` over all texts in batches; returns (results, stage seconds)."""
+    results, timings = [], {}
+    for start in range(0, len(texts), batch_size):
+        batch_results, batch_timings = analyze_batch(texts[start:start + batch_size], model, vectorizer, rules)
+        results.extend(batch_results)
+        for stage, seconds in batch_timings.items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+    return results, timings
+
+
+def _rate(flags):
+    return round(float(np.mean(flags)), 4) if len(flags) else 0.0
+
+
+def compare(baseline, candidate, classes):
+    """Disagreement rates and probability shifts between two replays of the same texts."""
+    label = [b["prediction"] != c["prediction"] for b, c in zip(baseline, candidate)]
+    emotion = [b["emotion"] != c["emotion"] for b, c in zip(baseline, candidate)]
+    aspects = [b["aspects"] != c["aspects"] for b, c in zip(baseline, candidate)]
+    sarcasm = [b["sarcasm"] != c["sarcasm"] for b, c in zip(baseline, candidate)]
+
+    base_p = np.array([[b["probs"].get(k, 0.0) for k in classes] for b in baseline])
+    cand_p = np.array([[c["probs"].get(k, 0.0) for k in classes] for c in candidate])
+    shift = np.abs(cand_p - base_p)
+
+    flips = {}
+    for b, c in zip(baseline, candidate):
+        if b["prediction"] != c["prediction"]:
+            key = f"{b['prediction']} -> {c['prediction']}"
+            flips[key] = flips.get(key, 0) + 1
+
+    return {
+        "label_disagreement": _rate(label),
+        "emotion_disagreement": _rate(emotion),
+        "aspect_disagreement": _rate(aspects),
+        "sarcasm_disagreement": _rate(sarcasm),
+        "label_flips": dict(sorted(flips.items(), key=lambda kv: -kv[1])),
+        "probability_shift_pct": {
+            "mean_abs": round(float(shift.mean()), 3) if shift.size else 0.0,
+            "p95_abs": round(float(np.percentile(shift, 95)), 3) if shift.size else 0.0,
+            "max_abs": round(float(shift.max()), 3) if shift.size else 0.0,
+            "mean_by_class": {k: round(float(v), 3) for k, v in zip(classes, (cand_p - base_p).mean(axis=0))} if shift.size else {},
+        },
+    }
+
+
+def latency_report(base_timings, cand_timings, n):
+    """Per-stage mean ms per request for both runs and the candidate - baseline delta."""
+    report = {}
+    for stage in base_timings:
+        b = base_timings[stage] * 1000 / max(n, 1)
+        c = cand_timings.get(stage, 0.0) * 1000 / max(n, 1)
+        report[stage] = {"baseline_ms": round(b, 4), "candidate_ms": round(c, 4), "delta_ms": round(c - b, 4)}
+    return report
+
+
+def shadow_report(records, base, candidate, batch_size=512):
+    """Replay ``records`` against ``base`` and ``candidate`` (dicts with model/vectorizer/rules)."""
+    texts = [r["text"] for r in records]
+    if not texts:
+        # nothing captured (or --limit 0): the vectorizer rejects empty batches
+        return {"requests": 0, "candidate_vs_baseline": compare([], [], []), "latency_per_request": {}}, [], []
+    # warm both pipelines up so one-off costs don't land in the latency numbers
+    for side in (base, candidate):
+        analyze_batch(texts[:8], side["model"], side["vectorizer"], side.get("rules"))
+    base_results, base_timings = replay(texts, base["model"], base["vectorizer"], base.get("rules"), batch_size)
+    cand_results, cand_timings = replay(texts, candidate["model"], candidate["vectorizer"], candidate.get("rules"), batch_size)
+    classes = sorted({c.lower() for c in base["model"].classes_} | {c.lower() for c in candidate["model"].classes_})
+
+    report = {
+        "requests": len(texts),
+        "candidate_vs_baseline": compare(base_results, cand_results, classes),
+        "latency_per_request": latency_report(base_timings, cand_timings, len(texts)),
+    }
+    # how far today's artifacts have drifted from what was served when captured
+    if records and all("prediction" in r for r in records):
+        report["baseline_vs_logged"] = {
+            "label_disagreement": _rate([r["prediction"] != b["prediction"] for r, b in zip(records, base_results)]),
+        }
+    return report, base_results, cand_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay captured Senticore requests against a candidate.")
+    parser.add_argument("log", help="JSONL capture written by the app (SENTICORE_CAPTURE)")
+    parser.add_argument("--model", default="senticore_model.pkl")
+    parser.add_argument("--vectorizer", default="senticore_vectorizer.pkl")
+    parser.add_argument("--candidate-model", help="defaults to --model")
+    parser.add_argument("--candidate-vectorizer", help="defaults to --vectorizer")
+    parser.add_argument("--candidate-rules", help="Python file with revised rule functions")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N requests")
+    parser.add_argument("--report", default="shadow_report.json")
+    parser.add_argument("--diffs", help="optional JSONL of requests whose outputs differ")
+    args = parser.parse_args(argv)
+
+    if not (args.candidate_model or args.candidate_vectorizer or args.candidate_rules):
+        parser.error("give at least one of --candidate-model, --candidate-vectorizer, --candidate-rules")
+
+    records = load_log(args.log, args.limit)
+    base = {"model": joblib.load(args.model), "vectorizer": joblib.load(args.vectorizer)}
+    candidate = {
+        "model": joblib.load(args.candidate_model) if args.candidate_model else base["model"],
+        "vectorizer": joblib.load(args.candidate_vectorizer) if args.candidate_vectorizer else base["vectorizer"],
+        "rules": load_rules(args.candidate_rules) if args.candidate_rules else None,
+    }
+
+    report, base_results, cand_results = shadow_report(records, base, candidate, args.batch_size)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.diffs:
+        with open(args.diffs, "w", encoding="utf-8") as f:
+            for b, c in zip(base_results, cand_results):
+                if any(b[k] != c[k] for k in ("prediction", "emotion", "aspects", "sarcasm")):
+                    f.write(json.dumps({"text": b["text"], "baseline": b, "candidate": c}, ensure_ascii=False) + "\n")
+
+    cmp = report["candidate_vs_baseline"]
+    print(f"Replayed {report['requests']} requests")
+    print(f"Label disagreement:   {cmp['label_disagreement']:.2%}")
+    print(f"Emotion disagreement: {cmp['emotion_disagreement']:.2%}")
+    print(f"Aspect disagreement:  {cmp['aspect_disagreement']:.2%}")
+    print(f"Mean |Δprob|:         {cmp['probability_shift_pct']['mean_abs']} pts")
+    for stage, lat in report["latency_per_request"].items():
+        print(f"  {stage:<10} {lat['baseline_ms']:>9} ms -> {lat['candidate_ms']:>9} ms ({lat['delta_ms']:+} ms)")
+    print(f"✅ Report saved to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Senticore • Shared storage backend
+
+Users, hashed credentials, session tokens and per-user history live here
+instead of ``st.session_state`` so that any app replica can serve any user.
+
+Backends:
+- ``SQLiteBackend``  – default; a single database file shared by all
+  replicas on the same host. It runs in WAL mode, which needs shared
+  memory, so the file must not live on a network filesystem (NFS/SMB).
+- ``InMemoryBackend`` – a process-local key/value stand-in for a networked
+  store (Redis-style); handy for development and tests. Replicas on several
+  hosts need a networked store implementing the same methods.
+
+Session tokens expire after ``SESSION_TTL_SECONDS`` without activity; each
+``touch_session`` extends them and ``rotate_session`` swaps in a new token.
+
+Pick one with ``SENTICORE_BACKEND`` (``sqlite`` / ``memory``) and set the
+database location with ``SENTICORE_DB``.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+
+SESSION_TTL_SECONDS = 30 * 60    # idle timeout; extended while the user is active
+SESSION_RENEW_AFTER = 60         # don't rewrite the expiry more often than this
+PBKDF2_ITERATIONS = 200_000
+
+
+# ---------------------------
+# Password hashing
+# ---------------------------
+def hash_password(password, salt=None):
+    """Return ``"pbkdf2_sha256$<iterations>$<salt>$<hash>"`` for a password."""
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${salt}${digest.hex()}"
+
+
+def verify_password(password, stored):
+    try:
+        _, iterations, salt, expected = stored.split("$")
+    except (AttributeError, ValueError):
+        return False
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), int(iterations))
+    return hmac.compare_digest(digest.hex(), expected)
+
+
+def _encode_entry(entry):
+    return json.dumps(entry, ensure_ascii=False)
+
+
+def _decode_entry(raw):
+    return json.loads(raw)
+
+
+# ---------------------------
+# SQLite backend
+# ---------------------------
+class SQLiteBackend:
+    """Shared store backed by one SQLite file (WAL mode, one connection per call)."""
+
+    def __init__(self, path="senticore.db", session_ttl=SESSION_TTL_SECONDS):
+        self.path = path
+        self.session_ttl = session_ttl
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    password_hash TEXT NOT NULL,
+                    created REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS sessions (
+                    token TEXT PRIMARY KEY,
+                    username TEXT NOT NULL REFERENCES users(username),
+                    expires REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT NOT NULL REFERENCES users(username),
+                    entry TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS history_user ON history(username, id);
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    # users
+    def create_user(self, username, password):
+        """Store a new user; returns False if the name is already taken."""
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT INTO users (username, password_hash, created) VALUES (?, ?, ?)",
+                    (username, hash_password(password), time.time()),
+                )
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def verify_user(self, username, password):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT password_hash FROM users WHERE username = ?", (username,)).fetchone()
+        return row is not None and verify_password(password, row[0])
+
+    # sessions
+    def create_session(self, username):
+        token = secrets.token_urlsafe(32)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO sessions (token, username, expires) VALUES (?, ?, ?)",
+                (token, username, time.time() + self.session_ttl),
+            )
+        return token
+
+    def touch_session(self, token):
+        """Slide a live session's expiry forward; returns False if it expired or was revoked."""
+        if not token:
+            return False
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT expires FROM sessions WHERE token = ?", (token,)).fetchone()
+            if row is None or row[0] < now:
+                return False
+            if row[0] < now + self.session_ttl - SESSION_RENEW_AFTER:
+                conn.execute("UPDATE sessions SET expires = ? WHERE token = ?", (now + self.session_ttl, token))
+        return True
+
+    def rotate_session(self, token):
+        """Replace a live token with a fresh one; returns ``(username, new_token)`` or ``(None, None)``."""
+        if not token:
+            return None, None
+        now = time.time()
+        new_token = secrets.token_urlsafe(32)
+        with closing(self._connect()) as conn, conn:
+            # the DELETE takes the write lock, so two restores can't both win
+            conn.execute("DELETE FROM sessions WHERE expires < ?", (now,))
+            row = conn.execute("SELECT username FROM sessions WHERE token = ?", (token,)).fetchone()
+            if row is None:
+                return None, None
+            conn.execute(
+                "UPDATE sessions SET token = ?, expires = ? WHERE token = ?",
+                (new_token, now + self.session_ttl, token),
+            )
+        return row[0], new_token
+
+    def delete_session(self, token):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
+
+    # history
+    def add_history(self, username, entry):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT INTO history (username, entry) VALUES (?, ?)", (username, _encode_entry(entry)))
+
+    def get_history(self, username):
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT entry FROM history WHERE username = ? ORDER BY id", (username,)).fetchall()
+        return [_decode_entry(r[0]) for r in rows]
+
+
+# ---------------------------
+# In-memory backend
+# ---------------------------
+class InMemoryBackend:
+    """Key/value stand-in for a networked store, shared by all sessions of one process.
+
+    Values are kept serialized (like they would be on the wire) under
+    ``user:<name>``, ``session:<token>`` and ``history:<name>`` keys.
+    """
+
+    def __init__(self, session_ttl=SESSION_TTL_SECONDS):
+        self.session_ttl = session_ttl
+        self._data = {}
+        self._lock = threading.Lock()
+
+    # users
+    def create_user(self, username, password):
+        key = f"user:{username}"
+        with self._lock:
+            if key in self._data:
+                return False
+            self._data[key] = hash_password(password)
+        return True
+
+    def verify_user(self, username, password):
+        stored = self._data.get(f"user:{username}")
+        return stored is not None and verify_password(password, stored)
+
+    # sessions
+    def create_session(self, username):
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._data[f"session:{token}"] = (username, time.time() + self.session_ttl)
+        return token
+
+    def touch_session(self, token):
+        if not token:
+            return False
+        key = f"session:{token}"
+        now = time.time()
+        with self._lock:
+            value = self._data.get(key)
+            if value is None or value[1] < now:
+                self._data.pop(key, None)
+                return False
+            if value[1] < now + self.session_ttl - SESSION_RENEW_AFTER:
+                self._data[key] = (value[0], now + self.session_ttl)
+        return True
+
+    def rotate_session(self, token):
+        if not token:
+            return None, None
+        now = time.time()
+        with self._lock:
+            value = self._data.pop(f"session:{token}", None)
+            if value is None or value[1] < now:
+                return None, None
+            new_token = secrets.token_urlsafe(32)
+            self._data[f"session:{new_token}"] = (value[0], now + self.session_ttl)
+        return value[0], new_token
+
+    def delete_session(self, token):
+        with self._lock:
+            self._data.pop(f"session:{token}", None)
+
+    # history
+    def add_history(self, username, entry):
+        with self._lock:
+            self._data.setdefault(f"history:{username}", []).append(_encode_entry(entry))
+
+    def get_history(self, username):
+        with self._lock:
+            raw = list(self._data.get(f"history:{username}", []))
+        return [_decode_entry(r) for r in raw]
+
+
+def get_backend(kind=None, path=None):
+    """Build the backend selected by arguments or SENTICORE_BACKEND / SENTICORE_DB."""
+    kind = (kind or os.environ.get("SENTICORE_BACKEND", "sqlite")).lower()
+    if kind == "sqlite":
+        return SQLiteBackend(path or os.environ.get("SENTICORE_DB", "senticore.db"))
+    if kind == "memory":
+        return InMemoryBackend()
+    raise ValueError(f"Unknown SENTICORE_BACKEND: {kind!r} (expected 'sqlite' or 'memory')")